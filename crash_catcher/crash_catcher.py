@@ -4,21 +4,44 @@ from __future__ import annotations
 
 import datetime
 import functools
+import itertools
 import os
 import pathlib
-import platform
 import sys
-import time
-import traceback
+from collections.abc import Mapping
 from typing import Any, Callable
 
 from ._version import __version__
 
+# template for the per-crash portion of the crash log that follows the system info
+_CRASH_LOG_DETAILS = (
+    "Python path: {path}\n"
+    "sys.argv: {argv}\n"
+    "\nCRASH DATA:\n"
+    "{name} called by {caller} crashed at {timestamp}\n"
+    "args={args!r}\n"
+    "kwargs={kwargs!r}\n"
+)
+
+# if this environment variable is set to a non-empty value when the decorator is applied,
+# the decorated function is returned unwrapped
+CRASH_CATCHER_DISABLED = "CRASH_CATCHER_DISABLED"
+
+# max length of the repr of a single mapping value written to the crash log
+_MAX_VALUE_LENGTH = 1000
+
 # store data to print out in crash log, set by set_crash_data
-_global_crash_data = {}
+_global_crash_data: dict[Any, Any] = {}
+
+# store callback functions to execute if a crash is handled;
+# stored in registration order, unregistered callbacks are replaced with None
+_global_callbacks: list[tuple[Callable[[], None], str | None] | None] = []
+
+# map callback id to index in _global_callbacks
+_callback_index: dict[int, int] = {}
 
-# store callback functions to execute if a crash is handled
-_global_callbacks = {}
+# generate unique ids for registered callbacks
+_callback_id_gen = itertools.count(1)
 
 __all__ = [
     "crash_catcher",
@@ -30,9 +53,10 @@ __all__ = [
 
 def _reset_crash_catcher():
     """Reset crash catcher state for testing"""
-    global _global_crash_data, _global_callbacks
+    global _global_crash_data, _global_callbacks, _callback_index
     _global_crash_data = {}
-    _global_callbacks = {}
+    _global_callbacks = []
+    _callback_index = {}
 
 
 def set_crash_data(key_: Any, data: Any):
@@ -56,8 +80,9 @@ def register_crash_callback(
         Callbacks will be executed in order they are registered.
     """
 
-    callback_id = time.monotonic_ns()
-    _global_callbacks[callback_id] = (func, message)
+    callback_id = next(_callback_id_gen)
+    _callback_index[callback_id] = len(_global_callbacks)
+    _global_callbacks.append((func, message))
     return callback_id
 
 
@@ -73,9 +98,23 @@ def unregister_crash_callback(callback_id: int):
     Note: After a callback is unregisterd, it will not be called if a crash is caught.
     """
     try:
-        del _global_callbacks[callback_id]
+        index = _callback_index.pop(callback_id)
     except KeyError:
         raise ValueError(f"Invalid callback_id: {callback_id}")
+    _global_callbacks[index] = None
+    if len(_global_callbacks) > 2 * len(_callback_index):
+        # tombstones outnumber live callbacks so rebuild the list without them
+        _compact_callbacks()
+
+
+def _compact_callbacks():
+    """Remove unregistered callbacks from _global_callbacks, preserving registration order"""
+    live = sorted(_callback_index.items(), key=lambda item: item[1])
+    _global_callbacks[:] = [_global_callbacks[index] for _, index in live]
+    _callback_index.clear()
+    _callback_index.update(
+        (callback_id, new_index) for new_index, (callback_id, _) in enumerate(live)
+    )
 
 
 def crash_catcher(
@@ -84,6 +123,7 @@ def crash_catcher(
     title: str,
     postamble: str | None = None,
     overwrite: bool = True,
+    traceback_limit: int | None = 200,
     **extra: Any,
 ):
     """Catch crash (uncaught exception) and create a crash dump file on error named filename
@@ -94,6 +134,8 @@ def crash_catcher(
         title: title to print to start of crash dump file
         postamble: optional message printed to stderr after crash dump file is created.
         overwrite: if True, overwrite existing file, otherwise increment filename until a non-existent filename is found
+        traceback_limit: max number of stack entries written in the traceback; the most recent entries
+            (where the crash occurred) are kept. None writes the full traceback
         extra: If kwargs provided, any additional arguments to the function will be printed to the crash file.
 
     Note: This decorator should be applied to the main function of the program.
@@ -102,74 +144,133 @@ def crash_catcher(
         and the crash file `crash_catcher.log` already exists, the filename will be incremented to
         `crash_catcher (1).log`, `crash_catcher (2).log`, and so on until a non-existent filename is found.
         This filename will be used to render the {filename} template.
+        If the environment variable CRASH_CATCHER_DISABLED is set to a non-empty value when the
+        decorator is applied, the function is returned undecorated and exceptions are not caught.
     """
 
+    if os.environ.get(CRASH_CATCHER_DISABLED):
+        # skip all decoration-time work and return the function unwrapped
+        return lambda func: func
+
     filename = (
         pathlib.Path(filename) if not isinstance(filename, pathlib.Path) else filename
     )
     filename = filename.resolve()
 
+    # gather static system info now rather than at crash time;
+    # platform.platform() may spawn subprocesses on some systems
+    # platform is only needed here, so it is not imported when crash_catcher is disabled
+    import platform
+
+    # import traceback now so the crash path does not need to import anything
+    import traceback
+
+    # sys.executable may be None or empty for embedded interpreters
+    python_executable = (
+        str(pathlib.Path(sys.executable).resolve()) if sys.executable else ""
+    )
+    sysinfo_bytes = (
+        "\nSYSTEM INFO:\n"
+        f"Platform: {platform.platform()}\n"
+        f"Python: {python_executable}\n"
+        f"Python version: {sys.version}\n"
+    ).encode("utf-8")
+
+    # extra kwargs do not change after decoration so format and encode them once
+    extra_data = "".join(f"{arg}: {value}\n" for arg, value in extra.items())
+    extra_bytes = extra_data.encode("utf-8")
+
     class Default(dict):
         def __missing__(self, key):
             return key
 
+    if overwrite:
+        # filename will not change so render the {filename} template now
+        # rather than at crash time
+        template_data = Default(filename=filename)
+        message = message.format_map(template_data)
+        title = title.format_map(template_data)
+        postamble = postamble.format_map(template_data) if postamble else ""
+    title_bytes = f"{title}\n".encode("utf-8")
+
+    # a negative limit tells traceback to keep the most recent entries
+    if traceback_limit is not None and traceback_limit > 0:
+        traceback_limit = -traceback_limit
+
     def decorated(func):
         @functools.wraps(func)
         def wrapped(*args, **kwargs):
-            nonlocal filename, message, title, postamble
-            caller = sys._getframe().f_back.f_code.co_name
-            name = func.__name__
-            timestamp = datetime.datetime.now().isoformat()
-            start_t = time.perf_counter()
             try:
                 return func(*args, **kwargs)
             except Exception as e:
-                stop_t = time.perf_counter()
+                # only gather caller and timestamp once a crash has occurred
+                # so the no-crash path does not pay for them
+                caller = sys._getframe().f_back.f_code.co_name
+                name = func.__name__
+                timestamp = datetime.datetime.now().isoformat()
 
                 # if filename needs to be incremented, do so now
-                # then update message, title, and postamble {filename} template
-                if filename.exists() and not overwrite:
-                    filename = _increment_filename(filename)
-                message = message.format_map(Default(filename=filename))
-                title = title.format_map(Default(filename=filename))
-                postamble = (
-                    postamble.format_map(Default(filename=filename))
-                    if postamble
-                    else ""
-                )
+                # then render message, title, and postamble {filename} template
+                crash_file = filename
+                crash_message, crash_postamble = message, postamble
+                crash_title_bytes = title_bytes
+                if not overwrite:
+                    crash_file = _increment_filename(crash_file)
+                    template_data = Default(filename=crash_file)
+                    crash_message = message.format_map(template_data)
+                    crash_title = title.format_map(template_data)
+                    crash_title_bytes = f"{crash_title}\n".encode("utf-8")
+                    crash_postamble = (
+                        postamble.format_map(template_data) if postamble else ""
+                    )
 
-                print(message, file=sys.stderr)
+                print(crash_message, file=sys.stderr)
                 print(f"{e}", file=sys.stderr)
 
                 # handle any callbacks
-                for f, msg in _global_callbacks.values():
+                for callback in _global_callbacks:
+                    if callback is None:
+                        continue
+                    f, msg = callback
                     if msg:
                         print(msg)
                     f()
 
-                with open(filename, "w") as f:
-                    f.write(f"{title}\n")
-                    f.write(f"Created: {datetime.datetime.now()}\n")
-                    f.write("\nSYSTEM INFO:\n")
-                    f.write(f"Platform: {platform.platform()}\n")
-                    f.write(f"Python: {pathlib.Path(sys.executable).resolve()}\n")
-                    f.write(f"Python version: {sys.version}\n")
-                    f.write(f"Python path: {sys.path}\n")
-                    f.write(f"sys.argv: {sys.argv}\n")
-                    f.write("\nCRASH DATA:\n")
-                    f.write(
-                        f"{name} called by {caller} at {timestamp} crashed after {stop_t-start_t} seconds\n"
+                # build the entire crash log in memory then write it in a single call;
+                # only the per-crash portions need to be encoded here
+                created = f"Created: {datetime.datetime.now()}\n"
+                details = _CRASH_LOG_DETAILS.format(
+                    path=sys.path,
+                    argv=sys.argv,
+                    name=name,
+                    caller=caller,
+                    timestamp=timestamp,
+                    args=args,
+                    kwargs=kwargs,
+                )
+                crash_data = _format_crash_data(_global_crash_data)
+                error = "".join(
+                    (
+                        f"Error: {e}\n",
+                        *traceback.format_exception(
+                            type(e), e, e.__traceback__, limit=traceback_limit
+                        ),
                     )
-                    f.write(f"{args=}\n")
-                    f.write(f"{kwargs=}\n")
-                    for k, v in _global_crash_data.items():
-                        f.write(f"{k}: {v}\n")
-                    for arg, value in extra.items():
-                        f.write(f"{arg}: {value}\n")
-                    f.write(f"Error: {e}\n")
-                    traceback.print_exc(file=f)
-                print(f"Crash log written to '{filename}'", file=sys.stderr)
-                print(f"{postamble}", file=sys.stderr)
+                )
+                data = b"".join(
+                    (
+                        crash_title_bytes,
+                        created.encode("utf-8"),
+                        sysinfo_bytes,
+                        f"{details}{crash_data}".encode("utf-8"),
+                        extra_bytes,
+                        error.encode("utf-8"),
+                    )
+                )
+
+                _write_crash_log(crash_file, data)
+                print(f"Crash log written to '{crash_file}'", file=sys.stderr)
+                print(f"{crash_postamble}", file=sys.stderr)
                 sys.exit(1)
 
         return wrapped
@@ -177,6 +278,53 @@ def crash_catcher(
     return decorated
 
 
+def _format_crash_data(crash_data: dict[Any, Any]) -> str:
+    """Format data set with set_crash_data() for the crash log.
+
+    Args:
+        crash_data: dict of crash data to format
+
+    Returns:
+        str with one line per item; Mapping values (e.g. globals()) are written one
+        key per line with each value's repr truncated to _MAX_VALUE_LENGTH
+    """
+    lines: list[str] = []
+    # bind names used in the loops to locals to avoid repeated lookups
+    append = lines.append
+    max_length = _MAX_VALUE_LENGTH
+    for key, value in crash_data.items():
+        if not isinstance(value, Mapping):
+            append(f"{key}: {value}\n")
+            continue
+        for subkey, subvalue in value.items():
+            try:
+                value_str = repr(subvalue)
+            except Exception as e:
+                value_str = f"<repr failed: {e}>"
+            if len(value_str) > max_length:
+                value_str = value_str[:max_length] + "...<truncated>"
+            append(f"{key}.{subkey}: {value_str}\n")
+    return "".join(lines)
+
+
+def _write_crash_log(filename: str | pathlib.Path, data: bytes):
+    """Write data to filename using low-level os calls, bypassing Python's buffered io.
+
+    Args:
+        filename: file to write; will be created or truncated
+        data: bytes to write
+    """
+    fd = os.open(filename, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o666)
+    try:
+        view = memoryview(data)
+        while view:
+            written = os.write(fd, view)
+            view = view[written:]
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
 def _increment_filename(filename: str | pathlib.Path) -> pathlib.Path:
     """Increment a filename if it exists, e.g. file.ext -> file (1).ext, and so on.
 
@@ -190,14 +338,31 @@ def _increment_filename(filename: str | pathlib.Path) -> pathlib.Path:
     Don't use this in cases where a race condition is likely to occur.
     """
     filename = pathlib.Path(filename)
-    if not filename.exists():
+    if not os.path.lexists(filename):
         return filename
     parent = filename.parent
     stem = filename.stem
     suffix = filename.suffix
+
+    # read the directory once instead of calling stat() for each candidate name;
+    # only names starting with stem can collide, and names are casefolded so a
+    # case-insensitive filesystem can't match an existing file
+    prefix = stem.casefold()
+    try:
+        with os.scandir(parent) as entries:
+            existing = {
+                name
+                for name in (entry.name.casefold() for entry in entries)
+                if name.startswith(prefix)
+            }
+    except OSError:
+        # directory may not be readable (only searchable) so probe each candidate
+        i = 1
+        while os.path.lexists(parent / f"{stem} ({i}){suffix}"):
+            i += 1
+        return parent / f"{stem} ({i}){suffix}"
+
     i = 1
-    while True:
-        new_filename = parent / pathlib.Path(f"{stem} ({i}){suffix}")
-        if not new_filename.exists():
-            return new_filename
+    while f"{stem} ({i}){suffix}".casefold() in existing:
         i += 1
+    return parent / f"{stem} ({i}){suffix}"
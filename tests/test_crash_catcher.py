@@ -1,6 +1,9 @@
 """Test crash catcher"""
 
+import importlib
 import pathlib
+import sys
+import typing
 
 import pytest
 
@@ -11,6 +14,10 @@ from crash_catcher import (
     set_crash_data,
     unregister_crash_callback,
 )
+from crash_catcher.crash_catcher import _increment_filename
+
+# the crash_catcher function shadows the crash_catcher.crash_catcher module on the package
+crash_catcher_module = importlib.import_module("crash_catcher.crash_catcher")
 
 
 @pytest.fixture(autouse=True)
@@ -136,6 +143,163 @@ def test_decorator_unregister(capsys, tmp_path: pathlib.Path):
     )
 
 
+def test_callback_order(capsys, tmp_path: pathlib.Path):
+    """Test that callbacks are run in order registered and unregistered callbacks are skipped"""
+
+    @crash_catcher(
+        filename=tmp_path / "crash_catcher.log",
+        message="The app has crashed",
+        title="Crash catcher demo",
+    )
+    def demo_crash_catcher():
+        """Demo crash_catcher decorator"""
+        register_crash_callback(lambda: print("first"))
+        callback_id = register_crash_callback(lambda: print("second"))
+        register_crash_callback(lambda: print("third"))
+        unregister_crash_callback(callback_id)
+        raise ValueError("Oh no, the app has crashed!")
+
+    with pytest.raises(SystemExit):
+        demo_crash_catcher()
+
+    captured = capsys.readouterr()
+    assert "second" not in captured.out
+    assert captured.out.index("first") < captured.out.index("third")
+
+
+def test_callback_churn(capsys, tmp_path: pathlib.Path):
+    """Test that register/unregister churn does not grow the callback list without bound"""
+
+    @crash_catcher(
+        filename=tmp_path / "crash_catcher.log",
+        message="The app has crashed",
+        title="Crash catcher demo",
+    )
+    def demo_crash_catcher():
+        """Demo crash_catcher decorator"""
+        raise ValueError("Oh no, the app has crashed!")
+
+    register_crash_callback(lambda: print("first"))
+    for _ in range(1000):
+        unregister_crash_callback(register_crash_callback(lambda: print("churn")))
+    register_crash_callback(lambda: print("last"))
+    assert len(crash_catcher_module._global_callbacks) <= 4
+
+    with pytest.raises(SystemExit):
+        demo_crash_catcher()
+
+    captured = capsys.readouterr()
+    assert "churn" not in captured.out
+    assert captured.out.index("first") < captured.out.index("last")
+
+
+def test_unregister_invalid_id():
+    """Test that unregister_crash_callback() raises ValueError for an invalid id"""
+    callback_id = register_crash_callback(lambda: None)
+    unregister_crash_callback(callback_id)
+    with pytest.raises(ValueError):
+        unregister_crash_callback(callback_id)
+
+
+def test_crash_data_mapping(tmp_path: pathlib.Path):
+    """Test that mapping crash data is written one key per line with long values truncated"""
+
+    @crash_catcher(
+        filename=tmp_path / "crash_catcher.log",
+        message="The app has crashed",
+        title="Crash catcher demo",
+    )
+    def demo_crash_catcher():
+        """Demo crash_catcher decorator"""
+        set_crash_data("mapping", {"foo": "bar", "big": "x" * 10_000})
+        raise ValueError("Oh no, the app has crashed!")
+
+    with pytest.raises(SystemExit):
+        demo_crash_catcher()
+
+    crash_log = (tmp_path / "crash_catcher.log").read_text()
+    assert "mapping.foo: 'bar'" in crash_log
+    assert "...<truncated>" in crash_log
+    assert "x" * 10_000 not in crash_log
+
+
+def test_disabled(monkeypatch, tmp_path: pathlib.Path):
+    """Test that crash_catcher returns the function unwrapped when CRASH_CATCHER_DISABLED is set"""
+    monkeypatch.setenv("CRASH_CATCHER_DISABLED", "1")
+
+    def demo_crash_catcher():
+        """Demo crash_catcher decorator"""
+        raise ValueError("Oh no, the app has crashed!")
+
+    decorated = crash_catcher(
+        filename=tmp_path / "crash_catcher.log", message="", title=""
+    )(demo_crash_catcher)
+    assert decorated is demo_crash_catcher
+
+    with pytest.raises(ValueError):
+        decorated()
+
+    assert not (tmp_path / "crash_catcher.log").exists()
+
+
+def test_traceback_limit(tmp_path: pathlib.Path):
+    """Test that traceback_limit keeps only the most recent stack entries in the crash log"""
+
+    def inner():
+        raise ValueError("Oh no, the app has crashed!")
+
+    @crash_catcher(
+        filename=tmp_path / "crash_catcher.log",
+        message="",
+        title="",
+        traceback_limit=1,
+    )
+    def demo_crash_catcher():
+        """Demo crash_catcher decorator"""
+        inner()
+
+    with pytest.raises(SystemExit):
+        demo_crash_catcher()
+
+    crash_log = (tmp_path / "crash_catcher.log").read_text()
+    assert "in inner" in crash_log
+    assert "in wrapped" not in crash_log
+    assert "ValueError: Oh no, the app has crashed!" in crash_log
+
+
+def test_wrapped_metadata(tmp_path: pathlib.Path):
+    """Test that the decorated function keeps the wrapped function's metadata"""
+
+    def demo_crash_catcher(x: int) -> str:
+        """Demo crash_catcher decorator"""
+
+    demo_crash_catcher.attr = "xyzzy"
+
+    decorated = crash_catcher(
+        filename=tmp_path / "crash_catcher.log", message="", title=""
+    )(demo_crash_catcher)
+    assert decorated.__name__ == "demo_crash_catcher"
+    assert decorated.__doc__ == "Demo crash_catcher decorator"
+    assert decorated.__wrapped__ is demo_crash_catcher
+    assert typing.get_type_hints(decorated) == {"x": int, "return": str}
+    assert decorated.attr == "xyzzy"
+
+
+def test_no_executable(monkeypatch, tmp_path: pathlib.Path):
+    """Test that crash_catcher works when sys.executable is None (embedded interpreters)"""
+    monkeypatch.setattr(sys, "executable", None)
+
+    @crash_catcher(filename=tmp_path / "crash_catcher.log", message="", title="")
+    def demo_crash_catcher():
+        """Demo crash_catcher decorator"""
+        raise ValueError("Oh no, the app has crashed!")
+
+    with pytest.raises(SystemExit):
+        demo_crash_catcher()
+
+    assert "Python: \n" in (tmp_path / "crash_catcher.log").read_text()
+
+
 def test_overwrite(tmp_path):
     """Test that crash_catcher overwrites existing file"""
 
@@ -182,3 +346,52 @@ def test_not_overwrite(tmp_path):
     actual_crash_file = tmp_path / "crash_catcher (1).log"
     assert actual_crash_file.exists()
     assert "Oh no, the app has crashed!" in actual_crash_file.read_text()
+
+
+def test_not_overwrite_multiple_crashes(capsys, tmp_path):
+    """Test that each crash with overwrite=False renders {filename} for the new file"""
+
+    crash_file = tmp_path / "crash_catcher.log"
+
+    @crash_catcher(
+        filename=crash_file,
+        message="",
+        title="",
+        postamble="See {filename}",
+        overwrite=False,
+    )
+    def demo_crash_catcher():
+        """Demo crash_catcher decorator"""
+        raise ValueError("Oh no, the app has crashed!")
+
+    for _ in range(3):
+        with pytest.raises(SystemExit):
+            demo_crash_catcher()
+
+    captured = capsys.readouterr()
+    assert f"See {crash_file}" in captured.err
+    assert f"See {tmp_path / 'crash_catcher (1).log'}" in captured.err
+    assert f"See {tmp_path / 'crash_catcher (2).log'}" in captured.err
+
+
+def test_increment_filename_case_insensitive(tmp_path):
+    """Test that _increment_filename skips names that differ from an existing file only in case"""
+    (tmp_path / "crash_catcher.log").touch()
+    (tmp_path / "CRASH_CATCHER (1).log").touch()
+    assert _increment_filename(tmp_path / "crash_catcher.log") == (
+        tmp_path / "crash_catcher (2).log"
+    )
+
+
+def test_increment_filename_scandir_error(monkeypatch, tmp_path):
+    """Test that _increment_filename falls back to probing each name if the directory can't be read"""
+
+    def scandir(path):
+        raise PermissionError(path)
+
+    (tmp_path / "crash_catcher.log").touch()
+    (tmp_path / "crash_catcher (1).log").touch()
+    monkeypatch.setattr(crash_catcher_module.os, "scandir", scandir)
+    assert _increment_filename(tmp_path / "crash_catcher.log") == (
+        tmp_path / "crash_catcher (2).log"
+    )